@@ -23,6 +23,9 @@ with [stash](https://github.com/ywangd/stash).
 
 ## Versions:
 
+* 1.4 - Add `add_many` to set up several gestures at once, `coalesce_hz` and
+  `states` parameters for continuous gestures, and several gestures in
+  `together_with`.
 * 1.3 - Add `first` to declare priority for the gesture, and an option to use
   the fine-tuning methods with ObjC gesture recognizers.
 * 1.2 - Add drag and drop support.  
@@ -93,6 +96,9 @@ and zooming (pinching):
     pincher = pinch(view, pinch_handler)
     panner.together_with(pincher)
     
+`together_with` accepts several gestures at once, e.g.
+`panner.together_with(pincher, rotator)`.
+
 All of these methods (`before`, `after` and `together_with`) also accept an
 ObjCInstance of any gesture recognizer, if you need to fine-tune co-operation
 with the gestures of some built-in views.
@@ -173,13 +179,15 @@ phone use:
   place.  
 """
 
-__version__ = '1.3'
+__version__ = '1.4'
 
 import ctypes
 import functools
 import inspect
+import operator
 import os
 import os.path
+import time
 import types
 
 import ui
@@ -195,6 +203,19 @@ UIPinchGestureRecognizer = ObjCClass('UIPinchGestureRecognizer')
 UIRotationGestureRecognizer = ObjCClass('UIRotationGestureRecognizer')
 UISwipeGestureRecognizer = ObjCClass('UISwipeGestureRecognizer')
 
+# Container that holds the Pythonista close gesture. This is a private UIKit
+# class, so it might not exist.
+
+try:
+    UILayoutContainerView = ObjCClass('UILayoutContainerView')
+except ValueError:
+    UILayoutContainerView = None
+
+# Selectors
+
+_gesture_action = sel('gestureAction')
+_dismiss = sel('dismiss:')
+
 #  Drag and drop classes
 
 NSItemProvider = ObjCClass('NSItemProvider')
@@ -202,7 +223,12 @@ UIDragItem = ObjCClass('UIDragItem')
 UIDragInteraction = ObjCClass('UIDragInteraction')
 UIDropInteraction = ObjCClass('UIDropInteraction')
 UIDropProposal = ObjCClass('UIDropProposal')
-NSItemProvider = ObjCClass('NSItemProvider')
+NSArray = ObjCClass('NSArray')
+NSData = ObjCClass('NSData')
+NSNumber = ObjCClass('NSNumber')
+NSString = ObjCClass('NSString')
+NSURL = ObjCClass('NSURL')
+UIImage = ObjCClass('UIImage')
 UIImagePNGRepresentation = c.UIImagePNGRepresentation
 UIImagePNGRepresentation.restype = c_void_p
 UIImagePNGRepresentation.argtypes = [c_void_p]
@@ -244,6 +270,11 @@ class Data():
     (docgen-ignore)
     """
     
+    __slots__ = (
+        'recognizer', 'view', 'location', 'state', 'number_of_touches',
+        'scale', 'rotation', 'velocity', 'translation',
+    )
+    
     def __init__(self):
         self.recognizer = self.view = self.location = self.state = \
             self.number_of_touches = self.scale = self.rotation = \
@@ -259,22 +290,25 @@ class Data():
             'failed'
         )
         result = 'Gesture data object:'
-        for key in dir(self):
-            if key.startswith('__'): continue
-            result += '\n'
+        for key in self.__slots__:
+            value = getattr(self, key, None)
+            if value is None: continue
             if key == 'state':
-                value = f'{str_states[self.state]} ({self.state})'
+                value = f'{str_states[value]} ({value})'
             elif key == 'recognizer':
-                value = self.recognizer.stringValue()
+                value = value.stringValue()
             elif key == 'view':
-                value = self.view.name or self.view
-            else:
-                value = getattr(self, key)
-            result += f'  {key}: {value}'
+                value = value.name or value
+            result += f'\n  {key}: {value}'
         return result
 
     def __repr__(self):
-        return f'{type(self)}: {self.__dict__}'
+        values = {
+            key: getattr(self, key)
+            for key in self.__slots__
+            if hasattr(self, key)
+        }
+        return f'{type(self)}: {values}'
 
     @property
     def began(self):
@@ -296,13 +330,23 @@ class Data():
 class ObjCPlus:
     """ docgen-ignore """
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._python_methods = []
+        for key in dir(cls):
+            value = getattr(cls, key)
+            if (inspect.isfunction(value) and
+            not key.startswith('__') and 
+            not '_self' in inspect.signature(value).parameters):
+                cls._python_methods.append((key, value))
+    
     def __new__(cls, *args, **kwargs):
-        objc_class = getattr(cls, '_objc_class', None)
+        objc_class = cls.__dict__.get('_objc_class')
         if objc_class is None:
             objc_class_name = cls.__name__ + '_ObjC'
             objc_superclass = getattr(
                 cls, '_objc_superclass', NSObject)
-            objc_debug = getattr(cls, '_objc_debug', True)
+            objc_debug = getattr(cls, '_objc_debug', False)
             
             #'TempClass_'+str(uuid.uuid4())[-12:]
             
@@ -334,14 +378,10 @@ class ObjCPlus:
         
         instance = objc_class.alloc().init()
 
-        for key in dir(cls):
-            value = getattr(cls, key)
-            if inspect.isfunction(value):
-                if (not key.startswith('__') and 
-                not '_self' in inspect.signature(value).parameters):
-                    setattr(instance, key, types.MethodType(value, instance))
-                if key == '__init__':
-                    value(instance, *args, **kwargs)
+        for key, value in cls._python_methods:
+            setattr(instance, key, types.MethodType(value, instance))
+        if inspect.isfunction(cls.__init__):
+            cls.__init__(instance, *args, **kwargs)
 
         return instance
 
@@ -353,14 +393,63 @@ class ObjCDelegate(ObjCPlus):
             
 def _is_objc_type(objc_instance, objc_class):
     return objc_instance.isKindOfClass_(objc_class.ptr)
+    
+def _pointer(objc_instance):
+    return objc_instance.ptr.value
+    
+# Gesture handlers by the pointer value of their recognizer. UIKit does not
+# retain the target of a recognizer, so this keeps the handlers alive until
+# they are removed.
+_handlers = {}
+
+def _configure(recognizer, **attributes):
+    for name, value in attributes.items():
+        if value:
+            setattr(recognizer, name, value)
+
+def _limit(handler, coalesce_hz, states):
+    if coalesce_hz:
+        handler.min_interval = 1 / coalesce_hz
+    if states:
+        handler.state_mask = functools.reduce(
+            operator.or_, (1 << state for state in states), 0)
+
+def _pan_data(data, recognizer, view_objc):
+    trans = recognizer.translationInView_(view_objc)
+    vel = recognizer.velocityInView_(view_objc)
+    data.translation = ui.Point(trans.x, trans.y)
+    data.velocity = ui.Point(vel.x, vel.y)
+    
+def _pinch_data(data, recognizer, view_objc):
+    data.scale = recognizer.scale()
+    data.velocity = recognizer.velocity()
+    
+def _rotation_data(data, recognizer, view_objc):
+    data.rotation = recognizer.rotation()
+    data.velocity = recognizer.velocity()
+
+# Gesture-specific data, by recognizer class
+_extra_data = {
+    id(UIPanGestureRecognizer): _pan_data,
+    id(UIScreenEdgePanGestureRecognizer): _pan_data,
+    id(UIPinchGestureRecognizer): _pinch_data,
+    id(UIRotationGestureRecognizer): _rotation_data,
+}
 
 class UIGestureRecognizerDelegate(ObjCDelegate):
     """ docgen-ignore """
     
     def __init__(self, recognizer_class, view, handler_func):
         self.view = view
+        self.view_objc = view.objc_instance
         self.handler_func = handler_func
-        self.other_recognizers = []
+        self.other_recognizers = set()
+        self.min_interval = None
+        self.last_dispatch = 0
+        self.state_mask = None
+        self.delegate_set = False
+        
+        self.extra_data = _extra_data.get(id(recognizer_class))
         
         view.touch_enabled = True
 
@@ -368,44 +457,49 @@ class UIGestureRecognizerDelegate(ObjCDelegate):
             self.recognizer = replace_close_gesture(view, recognizer_class)
         else:
             self.recognizer = recognizer_class.alloc().initWithTarget_action_(
-                self, 'gestureAction').autorelease()
+                self, _gesture_action).autorelease()
             view.objc_instance.addGestureRecognizer_(self.recognizer)
 
-        retain_global(self)
+        recognizer = self.recognizer
+        self.get_state = recognizer.state
+        self.get_location = recognizer.locationInView_
+        self.get_number_of_touches = recognizer.numberOfTouches
+
+        _handlers[_pointer(recognizer)] = self
     
     def gestureAction(_self, _cmd):
         self = ObjCInstance(_self)
-        view = self.view
         recognizer = self.recognizer
+        state = self.get_state()
+        state_mask = self.state_mask
+        if state_mask and not state_mask & (1 << state):
+            return
+        if state == CHANGED and self.min_interval:
+            now = time.monotonic()
+            if now - self.last_dispatch < self.min_interval:
+                return
+            self.last_dispatch = now
+        view = self.view
+        view_objc = self.view_objc
         handler_func = self.handler_func
         data = Data()
         data.recognizer = recognizer
         data.view = view
-        location = recognizer.locationInView_(view.objc_instance)
+        location = self.get_location(view_objc)
         data.location = ui.Point(location.x, location.y)
-        data.state = recognizer.state()
-        data.number_of_touches = recognizer.numberOfTouches()
+        data.state = state
+        data.number_of_touches = self.get_number_of_touches()
         
-        if (_is_objc_type(recognizer, UIPanGestureRecognizer) or 
-        _is_objc_type(recognizer, UIScreenEdgePanGestureRecognizer)):
-            trans = recognizer.translationInView_(ObjCInstance(view))
-            vel = recognizer.velocityInView_(ObjCInstance(view))
-            data.translation = ui.Point(trans.x, trans.y)
-            data.velocity = ui.Point(vel.x, vel.y)
-        elif _is_objc_type(recognizer, UIPinchGestureRecognizer):
-            data.scale = recognizer.scale()
-            data.velocity = recognizer.velocity()
-        elif _is_objc_type(recognizer, UIRotationGestureRecognizer):
-            data.rotation = recognizer.rotation()
-            data.velocity = recognizer.velocity()
+        extra_data = self.extra_data
+        if extra_data is not None:
+            extra_data(data, recognizer, view_objc)
     
         handler_func(data)
         
     def gestureRecognizer_shouldRecognizeSimultaneouslyWithGestureRecognizer_(
             _self, _sel, _gr, _other_gr):
         self = ObjCInstance(_self)
-        other_gr = ObjCInstance(_other_gr)
-        return other_gr in self.other_recognizers
+        return _other_gr in self.other_recognizers
         
     @on_main_thread
     def first(self):
@@ -428,12 +522,15 @@ class UIGestureRecognizerDelegate(ObjCDelegate):
             other_recognizer)
             
     @on_main_thread
-    def together_with(self, other):
-        other_recognizer = (other.recognizer 
-        if isinstance(other, type(self))
-        else other)
-        self.other_recognizers.append(other_recognizer)
-        self.recognizer.delegate = self
+    def together_with(self, *others):
+        for other in others:
+            other_recognizer = (other.recognizer 
+            if isinstance(other, type(self))
+            else other)
+            self.other_recognizers.add(_pointer(other_recognizer))
+        if not self.delegate_set:
+            self.recognizer.delegate = self
+            self.delegate_set = True
 
         
 #docgen: Gestures
@@ -452,11 +549,9 @@ def tap(view, action,
     """
     handler = UIGestureRecognizerDelegate(UITapGestureRecognizer, view, action)
 
-    recognizer = handler.recognizer
-    if number_of_taps_required:
-        recognizer.numberOfTapsRequired = number_of_taps_required
-    if number_of_touches_required:
-        recognizer.numberOfTouchesRequired = number_of_touches_required
+    _configure(handler.recognizer,
+        numberOfTapsRequired=number_of_taps_required,
+        numberOfTouchesRequired=number_of_touches_required)
 
     return handler
 
@@ -475,7 +570,9 @@ def long_press(view, action,
         number_of_taps_required=None,
         number_of_touches_required=None,
         minimum_press_duration=None,
-        allowable_movement=None):
+        allowable_movement=None,
+        coalesce_hz=None,
+        states=None):
     """ Call `action` when a long press gesture is recognized for the
     `view`. Note that this is a continuous gesture; you might want to
     check for `data.changed` or `data.ended` to get the desired results.
@@ -490,25 +587,30 @@ def long_press(view, action,
       recognition treshold.
     * `allowable_movement` - Set to change the default 10 point maximum
     distance allowed for the gesture to be recognized.
+    * `coalesce_hz` - Set to limit how many times per second `action` is
+      called with `CHANGED` updates, if the handler cannot keep up with
+      every event. Other states are always delivered.
+    * `states` - Set to a list or tuple of states, e.g.
+      `(gestures.CHANGED, gestures.ENDED)`, to only call `action` for
+      those states.
     """
     handler = UIGestureRecognizerDelegate(UILongPressGestureRecognizer, view, action)
 
-    recognizer = handler.recognizer
-    if number_of_taps_required:
-        recognizer.numberOfTapsRequired = number_of_taps_required
-    if number_of_touches_required:
-        recognizer.numberOfTouchesRequired = number_of_touches_required
-    if minimum_press_duration:
-        recognizer.minimumPressDuration = minimum_press_duration
-    if allowable_movement:
-        recognizer.allowableMovement = allowable_movement
+    _configure(handler.recognizer,
+        numberOfTapsRequired=number_of_taps_required,
+        numberOfTouchesRequired=number_of_touches_required,
+        minimumPressDuration=minimum_press_duration,
+        allowableMovement=allowable_movement)
+    _limit(handler, coalesce_hz, states)
 
     return handler
 
 @on_main_thread
 def pan(view, action,
         minimum_number_of_touches=None,
-        maximum_number_of_touches=None):
+        maximum_number_of_touches=None,
+        coalesce_hz=None,
+        states=None):
     """ Call `action` when a pan gesture is recognized for the `view`.
     This is a continuous gesture.
 
@@ -516,6 +618,12 @@ def pan(view, action,
 
     * `minimum_number_of_touches` - Set to control the gesture recognition.
     * `maximum_number_of_touches` - Set to control the gesture recognition.
+    * `coalesce_hz` - Set to limit how many times per second `action` is
+      called with `CHANGED` updates, if the handler cannot keep up with
+      every event. Other states are always delivered.
+    * `states` - Set to a list or tuple of states, e.g.
+      `(gestures.CHANGED, gestures.ENDED)`, to only call `action` for
+      those states.
 
     Handler `action` receives the following gesture-specific attributes
     in the `data` argument:
@@ -527,16 +635,16 @@ def pan(view, action,
     """
     handler = UIGestureRecognizerDelegate(UIPanGestureRecognizer, view, action)
 
-    recognizer = handler.recognizer
-    if minimum_number_of_touches:
-        recognizer.minimumNumberOfTouches = minimum_number_of_touches
-    if maximum_number_of_touches:
-        recognizer.maximumNumberOfTouches = maximum_number_of_touches
+    _configure(handler.recognizer,
+        minimumNumberOfTouches=minimum_number_of_touches,
+        maximumNumberOfTouches=maximum_number_of_touches)
+    _limit(handler, coalesce_hz, states)
 
     return handler
 
 @on_main_thread
-def edge_pan(view, action, edges):
+def edge_pan(view, action, edges,
+        coalesce_hz=None, states=None):
     """ Call `action` when a pan gesture starting from the edge is
     recognized for the `view`. This is a continuous gesture.
 
@@ -546,20 +654,40 @@ def edge_pan(view, action, edges):
     you have to set up separate recognizers with separate calls to this
     method.
 
+    Additional parameters:
+
+    * `coalesce_hz` - Set to limit how many times per second `action` is
+      called with `CHANGED` updates, if the handler cannot keep up with
+      every event. Other states are always delivered.
+    * `states` - Set to a list or tuple of states, e.g.
+      `(gestures.CHANGED, gestures.ENDED)`, to only call `action` for
+      those states.
+
     Handler `action` receives the same gesture-specific attributes in
     the `data` argument as pan gestures, see `pan`.
     """
     handler = UIGestureRecognizerDelegate(UIScreenEdgePanGestureRecognizer, view, action)
 
     handler.recognizer.edges = edges
+    _limit(handler, coalesce_hz, states)
 
     return handler
 
 @on_main_thread
-def pinch(view, action):
+def pinch(view, action,
+        coalesce_hz=None, states=None):
     """ Call `action` when a pinch gesture is recognized for the `view`.
     This is a continuous gesture.
 
+    Additional parameters:
+
+    * `coalesce_hz` - Set to limit how many times per second `action` is
+      called with `CHANGED` updates, if the handler cannot keep up with
+      every event. Other states are always delivered.
+    * `states` - Set to a list or tuple of states, e.g.
+      `(gestures.CHANGED, gestures.ENDED)`, to only call `action` for
+      those states.
+
     Handler `action` receives the following gesture-specific attributes
     in the `data` argument:
 
@@ -570,13 +698,25 @@ def pinch(view, action):
     """
     handler = UIGestureRecognizerDelegate(UIPinchGestureRecognizer, view, action)
 
+    _limit(handler, coalesce_hz, states)
+
     return handler
 
 @on_main_thread
-def rotation(view, action):
+def rotation(view, action,
+        coalesce_hz=None, states=None):
     """ Call `action` when a rotation gesture is recognized for the `view`.
     This is a continuous gesture.
 
+    Additional parameters:
+
+    * `coalesce_hz` - Set to limit how many times per second `action` is
+      called with `CHANGED` updates, if the handler cannot keep up with
+      every event. Other states are always delivered.
+    * `states` - Set to a list or tuple of states, e.g.
+      `(gestures.CHANGED, gestures.ENDED)`, to only call `action` for
+      those states.
+
     Handler `action` receives the following gesture-specific attributes
     in the `data` argument:
 
@@ -587,6 +727,8 @@ def rotation(view, action):
     """
     handler = UIGestureRecognizerDelegate(UIRotationGestureRecognizer, view, action)
 
+    _limit(handler, coalesce_hz, states)
+
     return handler
 
 @on_main_thread
@@ -600,7 +742,8 @@ def swipe(view, action,
     Additional parameters:
 
     * `direction` - Direction of the swipe to be recognized. Either one of
-      `gestures.RIGHT/LEFT/UP/DOWN`, or a list of multiple directions.
+      `gestures.RIGHT/LEFT/UP/DOWN`, or a list or tuple of multiple
+      directions.
     * `number_of_touches_required` - Set if you need to change the minimum
       number of touches required.
     * `min_distance` - Minimum distance the swipe gesture must travel in
@@ -617,23 +760,37 @@ def swipe(view, action,
     """
     handler = UIGestureRecognizerDelegate(UISwipeGestureRecognizer, view, action)
 
-    recognizer = handler.recognizer
-    if direction:
-        combined_dir = direction
-        if isinstance(direction, list):
-            combined_dir = 0
-            for one_direction in direction:
-                combined_dir |= one_direction
-        recognizer.direction = combined_dir
-    if number_of_touches_required:
-        recognizer.numberOfTouchesRequired = number_of_touches_required
-    if min_distance:
-        recognizer.minimumPrimaryMovement = min_distance
-    if max_distance:
-        recognizer.maximumPrimaryMovement = max_distance
+    if isinstance(direction, (list, tuple)):
+        direction = functools.reduce(operator.or_, direction, 0)
+    _configure(handler.recognizer,
+        direction=direction,
+        numberOfTouchesRequired=number_of_touches_required,
+        minimumPrimaryMovement=min_distance,
+        maximumPrimaryMovement=max_distance)
 
     return handler
 
+@on_main_thread
+def add_many(*specs):
+    """ Add several gestures with a single switch to the main thread, e.g.
+    when setting up a view with lots of gestures from a background thread.
+    
+    Each spec is a tuple of a gesture function, view, action and optionally
+    a dict of additional parameters:
+        
+        panner, pincher = add_many(
+            (pan, view, pan_handler, {'maximum_number_of_touches': 1}),
+            (pinch, view, pinch_handler),
+        )
+        
+    Returns a list of the handler objects, in the order of the specs.
+    """
+    handlers = []
+    for gesture, view, action, *kwargs in specs:
+        kwargs = kwargs[0] if kwargs else {}
+        handlers.append(gesture(view, action, **kwargs))
+    return handlers
+
 
 #docgen: Gesture management
 
@@ -651,14 +808,16 @@ def enable(handler):
 @on_main_thread
 def remove(view, handler):
     ''' Remove the recognizer from the view permanently. '''
+    _handlers.pop(_pointer(handler.recognizer), None)
     view.objc_instance.removeGestureRecognizer_(handler.recognizer)
 
 @on_main_thread
 def remove_all_gestures(view):
     ''' Remove all gesture recognizers from a view. '''
-    gestures = view.objc_instance.gestureRecognizers()
-    for recognizer in gestures:
-        remove(view, recognizer)
+    view_objc = view.objc_instance
+    for recognizer in list(view_objc.gestureRecognizers() or []):
+        _handlers.pop(_pointer(recognizer), None)
+        view_objc.removeGestureRecognizer_(recognizer)
 
 @on_main_thread
 def disable_swipe_to_close(view):
@@ -666,22 +825,29 @@ def disable_swipe_to_close(view):
     gesture used in Pythonista to end the program when in full screen
     view (`hide_title_bar` set to `True`).
 
-    Returns a tuple of the actual ObjC view and dismiss target.
+    Returns a tuple of the actual ObjC view and dismiss target, or `None`
+    if the close gesture could not be found.
     """
-    UILayoutContainerView = ObjCClass('UILayoutContainerView')
+    if UILayoutContainerView is None:
+        return None
     v = view.objc_instance
-    while not v.isKindOfClass_(UILayoutContainerView.ptr):
+    while v is not None and not _is_objc_type(v, UILayoutContainerView):
         v = v.superview()
+    if v is None:
+        return None
     for gr in v.gestureRecognizers():
-        if gr.isKindOfClass_(UISwipeGestureRecognizer.ptr):
+        if _is_objc_type(gr, UISwipeGestureRecognizer):
             gr.setEnabled(False)
             return v, gr.valueForKey_('targets')[0].target()
 
 @on_main_thread
 def replace_close_gesture(view, recognizer_class):
-    view, target = disable_swipe_to_close(view)
+    close_gesture = disable_swipe_to_close(view)
+    if close_gesture is None:
+        raise RuntimeError('Pythonista close gesture not found')
+    view, target = close_gesture
     recognizer = recognizer_class.alloc().initWithTarget_action_(
-        target, sel('dismiss:')).autorelease()
+        target, _dismiss).autorelease()
     view.addGestureRecognizer_(recognizer)
     return recognizer
 
@@ -706,17 +872,39 @@ class File:
                 self._data = fp.read()
         return self._data
         
-drag_and_drop_prefix = 'py_object_'
+def _str_external(payload):
+    return payload, None
+    
+def _image_external(payload):
+    try:
+        suggested_name = os.path.basename(payload.name)
+    except:
+        suggested_name = None
+    return ObjCInstance(payload), suggested_name
+    
+def _file_external(payload):
+    return '', payload.filename
+
+# Cross-app representation and suggested name, by drag payload type
+_external_payloads = {
+    str: _str_external,
+    ui.Image: _image_external,
+    File: _file_external,
+}
+
+# Addresses of the payloads of in-app drags started by this module. Only
+# these are ever cast back to Python objects.
+_drag_payload_ids = set()
 
 def _to_pyobject(item):
     item = ObjCInstance(item)
     try:
         data = item.localObject()
-        if data is None: return None
-        if not str(data).startswith(drag_and_drop_prefix):
+        if data is None or not _is_objc_type(data, NSNumber):
+            return None
+        address = data.unsignedLongLongValue()
+        if address not in _drag_payload_ids:
             return None
-        address_str = str(data)[len(drag_and_drop_prefix):]
-        address = int(address_str)
         result = ctypes.cast(address, ctypes.py_object).value
         return result
     except Exception as e:
@@ -744,40 +932,48 @@ class UIDragInteractionDelegate(ObjCDelegate):
         self = ObjCInstance(_self)
         session = ObjCInstance(_session)
         payload = self.data['payload_func'](self.view)        
+        previous = getattr(self, 'content_actual', None)
+        if previous is not None:
+            _drag_payload_ids.discard(id(previous))
         self.content_actual = {
             'payload': payload,
             'sender': self.view
         }
+        _drag_payload_ids.add(id(self.content_actual))
         
-        external_payload = ''
-        suggested_name = None
-        
-        if type(payload) is str:
-            external_payload = payload
-        elif type(payload) is ui.Image:
-            external_payload = ObjCInstance(payload)
-            try:
-                suggested_name = os.path.basename(payload.name)
-            except: pass
-        elif type(payload) is File:
-            suggested_name = payload.filename
+        to_external = _external_payloads.get(type(payload))
+        if to_external is None:
+            external_payload, suggested_name = '', None
+        else:
+            external_payload, suggested_name = to_external(payload)
             
         provider = NSItemProvider.alloc().initWithObject(external_payload)
         if suggested_name:
             provider.setSuggestedName_(suggested_name)
         item = UIDragItem.alloc().initWithItemProvider(provider)
         item.setLocalObject_(
-            str(drag_and_drop_prefix) +  
-            str(id(self.content_actual)))
+            NSNumber.numberWithUnsignedLongLong_(id(self.content_actual)))
         object_array = NSArray.arrayWithObject(item)
         return object_array.ptr
         
 
+# This module never changes the drop proposals after creating them, so the
+# same two are returned for every update. Created on first use.
+_drop_proposals = {}
+
+def _drop_proposal(operation):
+    proposal = _drop_proposals.get(operation)
+    if proposal is None:
+        proposal = UIDropProposal.alloc().initWithDropOperation(operation)
+        _drop_proposals[operation] = proposal
+    return proposal
+
 class UIDropInteractionDelegate(ObjCDelegate):
     """ docgen-ignore """
     
     def __init__(self, view, handler_func, accept=None):
         self.accept_type = None
+        self.accept_py_type = None
         if type(accept) is type:
             if accept is str:
                 self.accept_type = NSString
@@ -785,8 +981,8 @@ class UIDropInteractionDelegate(ObjCDelegate):
                 self.accept_type = UIImage
             elif accept is bytearray:
                 self.accept_type = NSData
-            accept = functools.partial(
-                lambda dtype, d, s, r: type(d) is dtype, accept)
+            self.accept_py_type = accept
+            accept = None
         self.functions = {
             'handler': handler_func,
             'accept': accept
@@ -794,6 +990,20 @@ class UIDropInteractionDelegate(ObjCDelegate):
         self.view = view
         view.touch_enabled = True
         
+        def completion_handler(_cmd, _object, _error):
+            obj = ObjCInstance(_object)
+            payload = None
+            if _is_objc_type(obj, NSString):
+                payload = str(obj)
+            elif _is_objc_type(obj, UIImage):
+                payload = ui.Image.from_data(uiimage_to_png(obj))
+            elif _is_objc_type(obj, NSURL):
+                payload = str(obj)
+            handler_func(payload, None, view)
+        self.completion_block = ObjCBlock(
+            completion_handler, restype=None,
+            argtypes=[c_void_p, c_void_p, c_void_p])
+        
         dropinteraction = UIDropInteraction.alloc().initWithDelegate_(self)
         view.objc_instance.addInteraction(dropinteraction)
         retain_global(self)
@@ -804,17 +1014,27 @@ class UIDropInteractionDelegate(ObjCDelegate):
     def dropInteraction_sessionDidUpdate_(_self, _cmd, _interaction, _session):
         self = ObjCInstance(_self)
         session = ObjCInstance(_session)
-        proposal = 2 # UIDropOperationCopy
+        proposal = _drop_proposal(2) # UIDropOperationCopy
         accept_func = self.functions['accept']
+        accept_py_type = self.accept_py_type
 
         if session.localDragSession():
-            if accept_func is not None:
+            if accept_py_type is not None:
+                for item in session.items():
+                    data = _to_pyobject(item)
+                    if (data is None or
+                    type(data['payload']) is not accept_py_type):
+                        proposal = _drop_proposal(1) # UIDropOperationForbidden
+            elif accept_func is not None:
                 for item in session.items():
                     data = _to_pyobject(item)
+                    if data is None:
+                        proposal = _drop_proposal(1) # UIDropOperationForbidden
+                        continue
                     payload = data['payload']
                     sender = data['sender']
                     if not accept_func(payload, sender, self.view):
-                        proposal = 1 # UIDropOperationForbidden
+                        proposal = _drop_proposal(1) # UIDropOperationForbidden
         else:
             pass
             '''
@@ -824,7 +1044,7 @@ class UIDropInteractionDelegate(ObjCDelegate):
                     proposal = 1 # UIDropOperationForbidden
             '''
 
-        return UIDropProposal.alloc().initWithDropOperation(proposal).ptr
+        return proposal.ptr
         
     def dropInteraction_performDrop_(_self, _cmd, _interaction, _session):
         self = ObjCInstance(_self)
@@ -834,26 +1054,14 @@ class UIDropInteractionDelegate(ObjCDelegate):
         if session.localDragSession():
             for item in session.items():
                 data = _to_pyobject(item)
+                if data is None:
+                    continue
                 payload = data['payload']
                 sender = data['sender']
                 handler(payload, sender, self.view)
         else:
             if self.accept_type is not None:
-                
-                def completion_handler(_cmd, _object, _error):
-                    obj = ObjCInstance(_object)
-                    payload = None
-                    if _is_objc_type(obj, NSString):
-                        payload = str(obj)
-                    elif _is_objc_type(obj, UIImage):
-                        payload = ui.Image.from_data(uiimage_to_png(obj))
-                    elif _is_objc_type(obj, NSURL):
-                        file_url = str(obj)
-                    handler(file_url, None, self.view)
-                handler_block = ObjCBlock(
-                    completion_handler, restype=None,
-                    argtypes=[c_void_p, c_void_p, c_void_p])
-                retain_global(handler_block)
+                handler_block = self.completion_block
                 
                 for item in session.items():
                     print('by item')
@@ -954,7 +1162,9 @@ if __name__ == '__main__':
             view.background_color[:3]) > 1.5 else 'white'
 
     def update_text(l, text):
-        l.text = '\n'.join([l.text.splitlines()[0]] + [text])
+        text = f'{l.name}\n{text}'
+        if l.text != text:
+            l.text = text
 
     def generic_handler(data):
         update_text(data.view,
@@ -1011,6 +1221,7 @@ if __name__ == '__main__':
         
 
     edge_l = ui.Label(
+        name='Edge pan (from right)',
         text='Edge pan (from right)',
         background_color='grey',
         text_color='white',
@@ -1026,22 +1237,22 @@ if __name__ == '__main__':
     bg.add_subview(v)
 
     label_count = -1
+    label_w = 175
+    label_h = 75
+    gap = 5
+    label_w_with_gap = label_w + gap
+    label_h_with_gap = label_h + gap
+    labels_per_line = math.floor((v.width - 2 * gap) / (label_w + gap))
+    left_margin = (v.width - labels_per_line * label_w_with_gap + gap) / 2
 
     def create_label(title, instance=None):
         global label_count
         label_count += 1
-        label_w = 175
-        label_h = 75
-        gap = 5
-        label_w_with_gap = label_w + gap
-        label_h_with_gap = label_h + gap
-        labels_per_line = math.floor((v.width - 2 * gap) / (label_w + gap))
-        left_margin = (v.width - labels_per_line * label_w_with_gap + gap) / 2
-        line = math.floor(label_count / labels_per_line)
-        column = label_count - line * labels_per_line
+        line, column = divmod(label_count, labels_per_line)
 
         if instance is None:
             instance = ui.Label(
+                name=title,
                 text=title,
                 text_color='white',
                 alignment=ui.ALIGN_CENTER,
@@ -48,8 +48,14 @@ from  types import SimpleNamespace
 import ui
 from scene import Point
 
+_atan2 = math.atan2
+_degrees = math.degrees
+_hypot = math.hypot
+
 class GestureTouch:
   
+  __slots__ = ('_location', 'prev_location', 'start_location')
+  
   def __init__(self, location):
     self._location = location
     self.prev_location = location
@@ -67,6 +73,14 @@ class GestureTouch:
   @property
   def distance_from_start(self):
     return abs(Point(*self.location) - Point(*self.start_location))
+    
+  @property
+  def distance_from_start_sq(self):
+    location = self._location
+    start_location = self.start_location
+    dx = location.x - start_location.x
+    dy = location.y - start_location.y
+    return dx*dx + dy*dy
 
 class GestureData:
 
@@ -79,6 +93,20 @@ class GestureData:
     'pan', 'pinch', 'rotate'
   )
   
+  edge_swipe_directions = (
+    'edge_swipe_up', 'edge_swipe_left',
+    'edge_swipe_right', 'edge_swipe_down',
+  )
+  # Gestures that must be over before the tap threshold
+  quick_gestures = (
+    'tap',
+    'swipe', 'swipe_left', 'swipe_right',
+    'swipe_up', 'swipe_down',
+    'edge_swipe',
+  ) + edge_swipe_directions
+  # Gestures that delay pan, pinch and rotate while still possible
+  discrete_gestures = ('long_press',) + quick_gestures
+  
   tap_threshold = 0.3 # seconds
   long_press_threshold = 0.5 # second
   move_threshold = 15 # pixels
@@ -96,25 +124,54 @@ class GestureData:
   LEFT = 'left'
   RIGHT = 'right'
   
+  __slots__ = (
+    'view', 'handlers', 'move_threshold_sq',
+    'gesture_states', 'possible_gestures', 'ended_gestures',
+    'touches', 'first_touch', 'second_touch', '_sum_x', '_sum_y',
+    'no_of_touches', 'state', 'direction',
+    'start_time', 'end_time', 'tap_deadline', 'long_press_deadline',
+    'location', 'prev_location',
+    'start_translation', 'translation', 'prev_translation',
+    'start_pinch_distance', 'pinch_distance', 'prev_pinch_distance',
+    'scale', 'prev_scale',
+    'start_angle', 'angle', 'prev_angle',
+    'rotation', 'prev_rotation',
+  )
+  
   def __init__(self, view):
     self.view = view
+    self.move_threshold_sq = self.move_threshold ** 2
+    self.handlers = {
+      gesture: getattr(view, 'on_'+gesture, None)
+      for gesture in self.gestures
+    }
     
     self.gesture_states = {}
+    self.possible_gestures = set()
+    self.ended_gestures = set()
     self.reset(*self.gestures)
       
     self.touches = {}
-    self.touches_in_order = []
+    # Touches used for pinch and rotation
+    self.first_touch = self.second_touch = None
+    # Running sums of touch coordinates, for the centroid
+    self._sum_x = self._sum_y = 0.0
     self.no_of_touches = 0   
     self.state = None
+    self.end_time = None
 
     self.location = None
     self.prev_location = None
     
   def reset(self, *gestures):
     for gesture in gestures:
-      self.gesture_states[gesture] = (self.POSSIBLE
-        if hasattr(self.view, 'on_'+gesture) else
-        self.NOT_POSSIBLE)
+      if self.handlers[gesture] is not None:
+        self.gesture_states[gesture] = self.POSSIBLE
+        self.possible_gestures.add(gesture)
+      else:
+        self.gesture_states[gesture] = self.NOT_POSSIBLE
+        self.possible_gestures.discard(gesture)
+      self.ended_gestures.discard(gesture)
       if gesture == 'pan':
         self.start_translation = None
         self.translation = None
@@ -133,7 +190,7 @@ class GestureData:
         self.prev_rotation = None
     
   def is_possible(self, *gestures):
-    return all((self.gesture_states[gesture] == self.POSSIBLE for gesture in gestures))
+    return self.possible_gestures.issuperset(gestures)
     
   def is_active(self, *gestures):
     return all((self.gesture_states[gesture] in (self.POSSIBLE, self.BEGAN, self.CHANGED) for gesture in gestures))
@@ -144,10 +201,11 @@ class GestureData:
   def fail(self, *gestures):
     for gesture in gestures:
       self.gesture_states[gesture] = self.FAILED
+      self.possible_gestures.discard(gesture)
+      self.ended_gestures.discard(gesture)
       
   def none_possible(self, *gestures):
-    return not any((
-      self.gesture_states[gesture] == self.POSSIBLE for gesture in gestures))
+    return self.possible_gestures.isdisjoint(gestures)
       
   def all_failed(self, *gestures):
     return all((
@@ -155,26 +213,30 @@ class GestureData:
     
   def check(self, *gestures):
     for gesture in gestures:
-      if self.is_active(gesture):
-        if self.is_possible(gesture):
-          self.begin(gesture)
-        else:
-          self.change(gesture)
+      state = self.gesture_states[gesture]
+      if state == self.POSSIBLE:
+        self.begin(gesture)
+      elif state == self.BEGAN or state == self.CHANGED:
+        self.change(gesture)
     
   def begin(self, gesture):
     self.gesture_states[gesture] = self.BEGAN
+    self.possible_gestures.discard(gesture)
     self.state = self.BEGAN
-    getattr(self.view, 'on_'+gesture)(self)
+    self.handlers[gesture](self)
     
   def change(self, gesture):
     self.gesture_states[gesture] = self.CHANGED
+    self.possible_gestures.discard(gesture)
     self.state = self.CHANGED
-    getattr(self.view, 'on_'+gesture)(self)
+    self.handlers[gesture](self)
     
   def end(self, gesture):
     self.gesture_states[gesture] = self.ENDED
+    self.possible_gestures.discard(gesture)
+    self.ended_gestures.add(gesture)
     self.state = self.ENDED
-    getattr(self.view, 'on_'+gesture)(self)
+    self.handlers[gesture](self)
     
   def soft_end(self, gesture):
     self.end(gesture)
@@ -194,25 +256,38 @@ class GestureData:
     
   @property
   def out_of_business(self):
-    return any((state is not None and state < self.POSSIBLE for state in self.gesture_states.values()))
+    return bool(self.ended_gestures)
+    
+  @property
+  def duration(self):
+    end_time = self.end_time
+    if end_time is None:
+      end_time = time.monotonic()
+    return end_time - self.start_time
     
   def get_center_location(self):
-    center_loc = Point(0,0)
-    for touch in self.touches.values():
-      center_loc += Point(*touch.location)
-    center_loc /= len(self.touches)     
-    return center_loc
+    no_of_touches = len(self.touches)
+    return Point(
+      self._sum_x / no_of_touches,
+      self._sum_y / no_of_touches)
     
   def get_pinch_distance(self):
-    distance_vector = (
-      self.touches_in_order[0].location -  
-      self.touches_in_order[1].location)
-    return abs(distance_vector)
+    a = self.first_touch.location
+    b = self.second_touch.location
+    return _hypot(a.x - b.x, a.y - b.y)
+    
+  def update_pinch_distance(self):
+    self.prev_pinch_distance = self.pinch_distance
+    self.pinch_distance = self.get_pinch_distance()
+    
+  def update_angle(self):
+    self.prev_angle = self.angle
+    self.angle = self.get_angle(self.prev_angle)
     
   def get_angle(self, prev_angle=None):
-    angle = self.degrees(
-      self.touches_in_order[0].location -  
-      self.touches_in_order[1].location)
+    a = self.first_touch.location
+    b = self.second_touch.location
+    angle = _degrees(_atan2(a.y - b.y, a.x - b.x))
     if prev_angle is not None and abs(prev_angle) > 90:
       if prev_angle > 0 and angle < 0:
         angle += 360
@@ -221,17 +296,23 @@ class GestureData:
     return angle
     
   def radians(self, vector):
-    rad = math.atan2(vector.y, vector.x)
-    return rad
+    return _atan2(vector.y, vector.x)
     
   def degrees(self, vector):
-    return math.degrees(self.radians(vector))
+    return _degrees(_atan2(vector.y, vector.x))
     
 
 class GestureMixin():
   
   def touch_began(self, touch):
     
+    handles_gestures = getattr(self, '_handles_gestures', None)
+    if handles_gestures is None:
+      handles_gestures = self._handles_gestures = any(
+        hasattr(self, 'on_'+gesture) for gesture in GestureData.gestures)
+    if not handles_gestures:
+      return
+    
     if not hasattr(self, '_gestures') or len(self._gestures.touches) == 0:
       self._gestures = GestureData(self)
     g = self._gestures
@@ -240,11 +321,18 @@ class GestureMixin():
       return
 
     if len(g.touches) == 0:
-      g.start_time = time.time()
+      g.start_time = time.monotonic()
+      g.tap_deadline = g.start_time + g.tap_threshold
+      g.long_press_deadline = g.start_time + g.long_press_threshold
       
     t = GestureTouch(touch.location)
     g.touches[touch.touch_id] = t
-    g.touches_in_order.append(t)
+    g._sum_x += touch.location.x
+    g._sum_y += touch.location.y
+    if g.first_touch is None:
+      g.first_touch = t
+    elif g.second_touch is None:
+      g.second_touch = t
     
     g.no_of_touches = max(g.no_of_touches, len(g.touches))
     
@@ -261,9 +349,7 @@ class GestureMixin():
       g.fail('edge_swipe_down')
     if touch.location.y < y + h - 20:
       g.fail('edge_swipe_up')
-    if g.all_failed('edge_swipe_up', 
-      'edge_swipe_left', 'edge_swipe_right', 
-      'edge_swipe_down'):
+    if g.all_failed(*g.edge_swipe_directions):
       g.fail('edge_swipe')
     
     
@@ -273,11 +359,8 @@ class GestureMixin():
       g.start_translation += g.location - g.prev_location
     
     if len(g.touches) >= 2:
-      g.prev_pinch_distance = g.pinch_distance
-      g.pinch_distance = g.get_pinch_distance()
-      
-      g.prev_angle = g.angle
-      g.angle = g.get_angle(g.prev_angle)
+      g.update_pinch_distance()
+      g.update_angle()
       
       if g.start_pinch_distance is None:
         g.start_pinch_distance = g.pinch_distance
@@ -290,60 +373,61 @@ class GestureMixin():
         g.start_angle += g.angle - g.prev_angle
     
   def touch_moved(self, touch):    
-    g = self._gestures
-    if g.out_of_business:
+    g = getattr(self, '_gestures', None)
+    if g is None or g.out_of_business:
       return
       
     t = g.touches[touch.touch_id]
-    g.duration = time.time() - g.start_time
+    now = time.monotonic()
+    g._sum_x += touch.location.x - t.location.x
+    g._sum_y += touch.location.y - t.location.y
     t.location = touch.location
     g.prev_location = g.location
     g.location = g.get_center_location()
     g.prev_translation = g.translation
     g.translation = g.location - g.start_translation
     
-    if t.distance_from_start > g.move_threshold:
+    if t.distance_from_start_sq > g.move_threshold_sq:
       g.fail('tap', 'long_press')
       
-    if g.duration > g.tap_threshold:
-      g.fail(
-        'tap',
-        'swipe', 'swipe_left', 'swipe_right', 
-        'swipe_up', 'swipe_down',
-        'edge_swipe',
-        'edge_swipe_up', 'edge_swipe_left', 
-        'edge_swipe_right', 
-        'edge_swipe_down',)
-      
-    if g.is_possible('long_press') and g.duration > g.long_press_threshold:
+    if now > g.tap_deadline:
+      g.fail(*g.quick_gestures)
+      
+    if now > g.long_press_deadline and g.is_possible('long_press'):
       g.end('long_press')
       return
       
-    if g.none_possible('tap', 'long_press', 
-      'swipe', 'swipe_left', 'swipe_right', 
-      'swipe_up', 'swipe_down',     
-      'edge_swipe', 'edge_swipe_up', 
-      'edge_swipe_left', 'edge_swipe_right', 
-      'edge_swipe_down',):
+    if g.none_possible(*g.discrete_gestures):
       g.check('pan')
       if len(g.touches) >= 2:      
         
-        g.prev_pinch_distance = g.pinch_distance
-        g.pinch_distance = g.get_pinch_distance()
+        g.update_pinch_distance()
         g.prev_scale = g.scale
         g.scale = g.pinch_distance/g.start_pinch_distance
         g.check('pinch')
         
-        g.prev_angle = g.angle
-        g.angle = g.get_angle(g.prev_angle)
+        g.update_angle()
         g.prev_rotation = g.rotation
         g.rotation = g.angle - g.start_angle
         g.check('rotate')
     
   def touch_ended(self, touch):
-    g = self._gestures
+    g = getattr(self, '_gestures', None)
+    if g is None:
+      return
 
-    del g.touches[touch.touch_id]
+    t = g.touches.pop(touch.touch_id)
+    g._sum_x -= t.location.x
+    g._sum_y -= t.location.y
+    if t is g.first_touch:
+      g.first_touch = None
+    elif t is g.second_touch:
+      g.second_touch = None
+    for other in g.touches.values():
+      if g.first_touch is None and other is not g.second_touch:
+        g.first_touch = other
+      elif g.second_touch is None and other is not g.first_touch:
+        g.second_touch = other
     if g.out_of_business:
       return
       
@@ -353,25 +437,22 @@ class GestureMixin():
       if g.is_active('pan'):
         g.start_translation += g.location - g.prev_location
       
-      g.prev_pinch_distance = g.pinch_distance
-      g.pinch_distance = g.get_pinch_distance()
       if g.is_active('pinch'):
         if len(g.touches) > 1:
+          g.update_pinch_distance()
           g.start_pinch_distance += g.pinch_distance - g.prev_pinch_distance
         else:
           g.soft_end('pinch')
           
-      g.prev_angle = g.angle
-      g.angle = g.get_angle(g.prev_angle)
       if g.is_active('rotate'):
         if len(g.touches) > 1:
+          g.update_angle()
           g.start_angle += g.angle - g.prev_angle
         else:
           g.soft_end('rotate')
         
     if len(g.touches) == 0:
-      g.end_time = time.time()
-      g.duration = g.end_time - g.start_time
+      g.end_time = time.monotonic()
 
       if g.is_possible('tap'):
         g.end('tap')
@@ -550,7 +631,7 @@ class ZoomPanView(GestureView):
   
 if __name__ == '__main__':
   
-  #import copy
+  from collections import deque
   
   class TestView(GestureView):
     
@@ -558,8 +639,15 @@ if __name__ == '__main__':
       self.background_color = 'black'
       super().__init__(**kwargs)
       self.data = None
+      self.dirty = False
       self.labels = {}
-      self.translate_track = []
+      self.touch_oval = ui.Path.oval(-40, -40, 80, 80)
+      self.crosshair = ui.Path()
+      self.crosshair.move_to(-40, 0)
+      self.crosshair.line_to(40, 0)
+      self.crosshair.move_to(0, -40)
+      self.crosshair.line_to(0, 40)
+      self.translate_track = deque(maxlen=20)
       
       self.hint = ui.Label(
         text='Play with gestures or swipe from this edge',
@@ -610,7 +698,12 @@ if __name__ == '__main__':
         data_string = f'Loc: {data.location}, Touches: {data.no_of_touches}'
       l.text = f'{gesture_name}\n{data_string}'
       self.data = data
-      self.set_needs_display()
+      self.redraw()
+      
+    def redraw(self):
+      if not self.dirty:
+        self.dirty = True
+        self.set_needs_display()
       
     def on_edge_swipe_left(self, data):
       def anim():
@@ -632,12 +725,12 @@ if __name__ == '__main__':
     def on_pan(self, data):
       self.show_status(data, 'Pan', f'Translation: {data.translation}')
       if data.began:
-        self.translate_track = [data.translation]
+        self.translate_track.clear()
+        self.translate_track.append(data.translation)
       elif data.ended:
         self.show_status(data, 'Pan', f'Ended')
       else:
         self.translate_track.append(data.translation)
-      self.translate_track = self.translate_track[-20:]
       
     def on_pinch(self, data):
       self.show_status(data, 'Pinch', f'Scale: {data.scale}')
@@ -646,36 +739,38 @@ if __name__ == '__main__':
       self.show_status(data, 'Rotate', f'Rotation: {data.rotation:.2f}')
     
     def on_debug(self, data):
-      self.data = copy.deepcopy(data)
-      self.set_needs_display()
+      self.data = data
+      self.redraw()
       
     def draw(self):
+      self.dirty = False
       if self.data is None or len(self.data.touches) == 0:
         return
-      c = self.bounds.center()
+      center_x, center_y = self.bounds.center()
+      c = Point(center_x, center_y)
       if self.data.translation is not None:
         c += self.data.translation
       for touch in self.data.touches.values():
         (x, y) = touch.location
-        p = ui.Path.oval(x-40, y-40, 80, 80)
-        ui.set_color('white')
-        p.stroke()
-        ui.set_color((0,1,0,0.5))
-        p.fill()
+        with ui.GState():
+          ui.concat_ctm(ui.Transform.translation(x, y))
+          ui.set_color('white')
+          self.touch_oval.stroke()
+          ui.set_color((0,1,0,0.5))
+          self.touch_oval.fill()
       (x, y) = self.data.location
-      p = ui.Path()
-      p.move_to(x-40, y)
-      p.line_to(x+40, y)
-      p.move_to(x, y-40)
-      p.line_to(x, y+40)
-      ui.set_color('darkgreen')
-      p.stroke()
+      with ui.GState():
+        ui.concat_ctm(ui.Transform.translation(x, y))
+        ui.set_color('darkgreen')
+        self.crosshair.stroke()
       
       if len(self.translate_track) > 1:
         p = ui.Path()
-        p.move_to(*(self.bounds.center() + self.translate_track[0]))
-        for pos in self.translate_track[1:]:
-          p.line_to(*(self.bounds.center() + pos))
+        track = iter(self.translate_track)
+        pos = next(track)
+        p.move_to(center_x + pos.x, center_y + pos.y)
+        for pos in track:
+          p.line_to(center_x + pos.x, center_y + pos.y)
         ui.set_color((1,0,0,0.5))
         p.stroke()
         